@@ -1,24 +1,59 @@
 #!/usr/bin/env python3
-import os, csv, json, random, webbrowser, sys, subprocess
+import os, json, glob, queue, random, threading, functools, importlib.util, webbrowser, sys, subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime, timedelta, time as dtime
-from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
 
+import numpy as np
 import tkinter as tk
 from tkinter import ttk, messagebox, colorchooser
 
-# Matplotlib
-try:
-    import matplotlib
-    matplotlib.use("TkAgg")
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-except Exception as e:
+# Matplotlib — checked now, imported on first use (_import_matplotlib) so the window opens without waiting on it
+if importlib.util.find_spec("matplotlib") is None:
     raise SystemExit(
         "Matplotlib is required.\n"
         "Ubuntu/Debian: sudo apt install python3-matplotlib\n"
         "Else:          python3 -m pip install matplotlib"
-    ) from e
+    )
+
+# Matplotlib is not thread-safe (text layout and font caches are process-wide), so every
+# render — the on-screen canvas on the Tk thread and render_png on the worker — holds this.
+_mpl_lock = threading.RLock()
+
+def _import_matplotlib():
+    global matplotlib, Figure, FigureCanvasTkAgg, FigureCanvasAgg, PolyCollection
+    if "Figure" in globals(): return
+    import matplotlib
+    matplotlib.use("TkAgg")
+    from matplotlib.figure import Figure  # no pyplot: skips its global figure-manager state
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg as _TkAgg
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import PolyCollection
+
+    class FigureCanvasTkAgg(_TkAgg):  # screen draws (draw_idle included) take _mpl_lock too
+        def draw(self):
+            with _mpl_lock: super().draw()
+
+# Numba (optional) — compiles the tick kernels to native code when installed
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs: return args[0]
+        return lambda f: f
+
+# orjson (optional) — faster settings/preset JSON; stdlib json otherwise. Both speak bytes.
+try:
+    import orjson
+    def _dumps(obj) -> bytes: return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes: return json.dumps(obj, indent=2).encode("utf-8")
+    _loads = json.loads
 
 # ===================== NY Trading Day Settings =====================
 NY_UTC_OFFSET_HOURS = -4               # Fixed NY offset for labeling/session checks
@@ -28,42 +63,43 @@ SKIP_HOUR_END_NY   = 18
 def is_in_skipped_hour_ny(t_local_ny: datetime) -> bool:
     return t_local_ny.hour == SKIP_HOUR_START_NY and (0 <= t_local_ny.minute < 60)
 
-def advance_ny_time_skipping_hour(t_local_ny: datetime, minutes: float) -> datetime:
-    """Advance NY local time by minutes, skipping 17:00–18:00 NY."""
-    if is_in_skipped_hour_ny(t_local_ny):
-        t_local_ny = t_local_ny.replace(hour=SKIP_HOUR_END_NY, minute=0, second=0, microsecond=0)
-    remaining = minutes
-    cur = t_local_ny
-    while remaining > 0:
-        boundary = cur.replace(hour=SKIP_HOUR_START_NY, minute=0, second=0, microsecond=0)
-        if cur >= boundary:
-            boundary = boundary + timedelta(days=1)
-        delta_to_boundary = (boundary - cur).total_seconds() / 60.0
-        if remaining < delta_to_boundary:
-            return cur + timedelta(minutes=remaining)
-        else:
-            cur = boundary.replace(hour=SKIP_HOUR_END_NY)
-            remaining -= max(0.0, delta_to_boundary)
-    return cur
+def ny_times_skipping_hour(start_ny: datetime, count: int, minutes: float) -> np.ndarray:
+    """NY local times start, start+minutes, ... (count of them) skipping 17:00–18:00 NY, as datetime64[us].
+
+    Works on integer microseconds: the trading clock runs 23h from each 18:00 NY open,
+    so an offset T into it maps to wall time open + (T // 23h) days + (T % 23h).
+    The step is rounded to the microsecond exactly as timedelta(minutes=...) rounds it.
+    """
+    us = 1_000_000; day = 24*3600*us; session = day - (SKIP_HOUR_END_NY - SKIP_HOUR_START_NY)*3600*us
+    step = timedelta(minutes=minutes) // timedelta(microseconds=1)
+    start = np.datetime64(start_ny, "us")
+    open_ = start.astype("datetime64[D]").astype("datetime64[us]") + np.timedelta64(SKIP_HOUR_END_NY*3600*us, "us")
+    if start < open_: open_ -= np.timedelta64(day, "us")  # session opened yesterday 18:00
+    offsets = (start - open_).astype(np.int64) + np.arange(count, dtype=np.int64) * step
+    k, r = np.divmod(offsets, session)
+    return open_ + (k*day + r).astype("timedelta64[us]")
+
+def datetime64_minute_strings(t: np.ndarray) -> np.ndarray:
+    """'YYYY-MM-DD HH:MM' for every datetime64 in t, formatted by NumPy (no per-item strftime)."""
+    s = np.datetime_as_string(t, unit="m").astype("<U16")  # 'YYYY-MM-DDTHH:MM'
+    s.view("<U1").reshape(len(s), 16)[:, 10] = " "
+    return s
+
+def hhmm_strings(minute_strings: np.ndarray) -> np.ndarray:
+    """'HH:MM' sliced out of datetime64_minute_strings() output."""
+    chars = minute_strings.view("<U1").reshape(len(minute_strings), 16)
+    return np.ascontiguousarray(chars[:, 11:16]).view("<U5").ravel()
 
 def ny_local_midnight_today() -> datetime:
     now = datetime.now()
     return now.replace(hour=0, minute=0, second=0, microsecond=0)
 
-def ny_to_utc_minutes_of_day(t_local_ny: datetime) -> int:
-    """Convert naive NY local to UTC minute-of-day for session windows."""
-    t_utc = t_local_ny - timedelta(hours=NY_UTC_OFFSET_HOURS)  # -(-4) = +4
-    return (t_utc.hour * 60 + t_utc.minute) % (24*60)
-
-def ny_to_utc_dt(t_local_ny: datetime) -> datetime:
-    """Convert NY local naive datetime to UTC naive datetime (fixed -4h offset)."""
-    return t_local_ny - timedelta(hours=NY_UTC_OFFSET_HOURS)
-
 # ===================== Palettes =====================
+@functools.lru_cache(maxsize=8)  # a handful of themes; the returned dict is shared, treat it as read-only
 def get_palette(theme: str):
     t = (theme or "Vintage").strip().lower()
     if t == "dark sleek":
-        return {
+        pal = {
             "APP_BG": "#0F172A", "CARD_BG": "#1E293B",
             "TXT": "#E2E8F0", "TXT2": "#94A3B8",
             "BORDER_SOFT": "#334155", "BORDER_STRONG": "#0B1220",
@@ -74,31 +110,73 @@ def get_palette(theme: str):
             "SCALE_TROUGH": "#0B1220", "SCALE_BAR": "#2563EB", "SCALE_KNOB": "#E2E8F0",
             "BTN_TXT": "#FFFFFF", "BTN_SEC_BG": "#273447", "BTN_SEC_TXT": "#E2E8F0",
         }
-    # Vintage
-    return {
-        "APP_BG": "#DDDAD0", "CARD_BG": "#F8F3CE",
-        "TXT": "#57564F", "TXT2": "#7A7A73",
-        "BORDER_SOFT": "#DDDAD0", "BORDER_STRONG": "#57564F",
-        "ACCENT": "#57564F",
-        "STATUS_BG": "#DDDAD0", "STATUS_TXT": "#57564F",
-        "CHART_BG_DEFAULT": "#F8F3CE", "AXIS": "#7A7A73",
-        "ENTRY_BG": "#FFFFFF", "ENTRY_FG": "#57564F", "ENTRY_FG_DISABLED": "#7A7A73",
-        "SCALE_TROUGH": "#EEEAD8", "SCALE_BAR": "#57564F", "SCALE_KNOB": "#57564F",
-        "BTN_TXT": "#F8F3CE", "BTN_SEC_BG": "#EFE8C9", "BTN_SEC_TXT": "#57564F",
-    }
+    else:  # Vintage
+        pal = {
+            "APP_BG": "#DDDAD0", "CARD_BG": "#F8F3CE",
+            "TXT": "#57564F", "TXT2": "#7A7A73",
+            "BORDER_SOFT": "#DDDAD0", "BORDER_STRONG": "#57564F",
+            "ACCENT": "#57564F",
+            "STATUS_BG": "#DDDAD0", "STATUS_TXT": "#57564F",
+            "CHART_BG_DEFAULT": "#F8F3CE", "AXIS": "#7A7A73",
+            "ENTRY_BG": "#FFFFFF", "ENTRY_FG": "#57564F", "ENTRY_FG_DISABLED": "#7A7A73",
+            "SCALE_TROUGH": "#EEEAD8", "SCALE_BAR": "#57564F", "SCALE_KNOB": "#57564F",
+            "BTN_TXT": "#F8F3CE", "BTN_SEC_BG": "#EFE8C9", "BTN_SEC_TXT": "#57564F",
+        }
+    pal["GRID_RGBA"] = _rgba(pal["TXT2"], 0.22)  # parsed once per palette, not per redraw
+    return pal
 
 # ===================== Model =====================
-@dataclass
-class Candle:
+class Candle(NamedTuple):
     t: datetime  # New York local (naive)
     o: float
     h: float
     l: float
     c: float
 
-def simulate_candle(open_price: float, ticks_per_candle: int, tick_size: float,
-                    up_prob: float, rng: Optional[random.Random] = None):
-    if rng is None: rng = random
+@dataclass
+class Series:
+    """Candles stored column-wise (SoA): one time array plus one float64 array per price field."""
+    t: np.ndarray  # datetime64[us], New York local (naive); microseconds keep fractional-minute timeframes exact
+    o: np.ndarray
+    h: np.ndarray
+    l: np.ndarray
+    c: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def __getitem__(self, i: int) -> Candle:
+        return Candle(t=self.t[i].astype(datetime), o=float(self.o[i]), h=float(self.h[i]),
+                      l=float(self.l[i]), c=float(self.c[i]))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    # Time labels are formatted once per series and shared by the chart axis and the CSV export
+    @functools.cached_property
+    def minute_strings(self) -> np.ndarray:
+        return datetime64_minute_strings(self.t)
+
+    @functools.cached_property
+    def hhmm(self) -> np.ndarray:
+        return hhmm_strings(self.minute_strings)
+
+    @classmethod
+    def empty(cls) -> "Series":
+        z = np.empty(0)
+        return cls(t=np.empty(0, dtype="datetime64[us]"), o=z, h=z, l=z, c=z)
+
+# "pcg64" draws every tick of a candle in one NumPy call; "legacy" keeps the old
+# per-tick random.Random loop so seeds saved before the switch still reproduce.
+RNG_KINDS = ("pcg64", "legacy")
+
+def make_rng(seed=None, kind: str = "pcg64"):
+    if kind == "legacy": return random.Random(seed)
+    if kind != "pcg64": raise ValueError(f"Unknown RNG '{kind}' (expected one of {', '.join(RNG_KINDS)}).")
+    return np.random.default_rng(seed)
+
+def _simulate_candle_legacy(open_price: float, ticks_per_candle: int, tick_size: float,
+                            up_prob: float, rng: random.Random):
     price = open_price
     high, low = price, price
     for _ in range(ticks_per_candle):
@@ -108,82 +186,258 @@ def simulate_candle(open_price: float, ticks_per_candle: int, tick_size: float,
         if price < low:  low = price
     return open_price, high, low, price
 
+def draw_ups(rng: np.random.Generator, shape, up_prob: float) -> np.ndarray:
+    """Boolean up/down flips without float draws.
+
+    p == 0.5 unpacks raw uint64 words (1 bit per tick, each row padded to whole
+    words so block draws match per-candle draws); any other p compares raw uint64
+    draws against p * 2**64.
+    """
+    if up_prob <= 0.0: return np.zeros(shape, dtype=bool)
+    if up_prob >= 1.0: return np.ones(shape, dtype=bool)
+    if up_prob == 0.5:
+        shape = np.atleast_1d(shape); ticks = int(shape[-1])
+        words = rng.integers(0, 1 << 64, size=(*shape[:-1], -(-ticks // 64)), dtype=np.uint64)
+        bits = np.unpackbits(words.view(np.uint8), axis=-1)
+        return bits[..., :ticks].view(bool)
+    return rng.integers(0, 1 << 64, size=shape, dtype=np.uint64) < np.uint64(int(up_prob * (1 << 64)))
+
+@njit(cache=True, nogil=True)
+def _sim_candle_nb(open_price, tick_size, ups):
+    """Walk one candle over pre-drawn flips; returns (high, low, close).
+
+    The walk counts whole ticks in an integer and scales by tick_size once at the end.
+    """
+    k = 0; k_hi = 0; k_lo = 0
+    for i in range(ups.shape[0]):
+        k += 1 if ups[i] else -1
+        k_hi = max(k_hi, k); k_lo = min(k_lo, k)  # min/max select, no data-dependent branch
+    return open_price + tick_size*k_hi, open_price + tick_size*k_lo, open_price + tick_size*k
+
+@njit(cache=True, nogil=True)
+def _simulate_core(start_price, tick_size, vol_mult, ups2d, o, h, l, c):
+    """Whole-series tick loop: sweeps a (candles, ticks) flip matrix into preallocated
+    o/h/l/c (each close is the next open) and returns the last price.
+
+    Flips are drawn by the caller, not with np.random inside the JIT, so a seed gives
+    the same chart with or without Numba.
+    """
+    price = start_price
+    for i in range(ups2d.shape[0]):
+        o[i] = price
+        h[i], l[i], price = _sim_candle_nb(price, tick_size * vol_mult[i], ups2d[i])
+        c[i] = price
+    return price
+
+def _simulate_block_np(start_price, tick_size, vol_mult, ups2d, o, h, l, c):
+    """NumPy twin of _simulate_core: one int32 cumsum along the tick axis for the whole block."""
+    k = np.where(ups2d, 1, -1).astype(np.int32).cumsum(axis=1, dtype=np.int32)
+    ticks = tick_size * vol_mult
+    # add.accumulate is sequential, so closes round exactly like the per-candle carry
+    c[:] = np.add.accumulate(np.concatenate(([start_price], ticks * k[:, -1])))[1:]
+    o[0] = start_price; o[1:] = c[:-1]
+    h[:] = o + ticks * np.maximum(k.max(axis=1), 0)
+    l[:] = o + ticks * np.minimum(k.min(axis=1), 0)
+    return float(c[-1])
+
+def simulate_candle(open_price: float, ticks_per_candle: int, tick_size: float,
+                    up_prob: float, rng=None):
+    """One candle = ticks_per_candle coin flips, drawn and accumulated in a single NumPy pass."""
+    if rng is None: rng = np.random.default_rng()
+    if isinstance(rng, random.Random):
+        return _simulate_candle_legacy(open_price, ticks_per_candle, tick_size, up_prob, rng)
+    ups = draw_ups(rng, max(0, ticks_per_candle), up_prob)
+    if HAVE_NUMBA:
+        high, low, close = _sim_candle_nb(open_price, tick_size, ups)
+        return open_price, high, low, close
+    # Walk in int32 tick counts (no float drift, half the memory traffic); scale once
+    path = np.where(ups, 1, -1).astype(np.int32).cumsum(dtype=np.int32)
+    k_hi = int(path.max(initial=0)); k_lo = int(path.min(initial=0)); k = int(path[-1]) if len(path) else 0  # 0 ticks: flat
+    return open_price, open_price + tick_size*k_hi, open_price + tick_size*k_lo, open_price + tick_size*k
+
+def session_mult_lut(session_volatility: Optional[List[Tuple[int,int,float]]]) -> np.ndarray:
+    """Tick-size multiplier for every UTC minute of the day (max over overlapping sessions)."""
+    lut = np.ones(24*60)
+    for s_start, s_end, m in session_volatility or ():
+        if s_start <= s_end:
+            lut[s_start:s_end] = np.maximum(lut[s_start:s_end], m)
+        else:  # window wraps past midnight UTC
+            lut[s_start:] = np.maximum(lut[s_start:], m)
+            lut[:s_end] = np.maximum(lut[:s_end], m)
+    return lut
+
+def session_multipliers(times_ny: np.ndarray, vol_lut: Optional[np.ndarray]) -> np.ndarray:
+    """Per-candle tick-size multiplier, gathered from a session_mult_lut() table (None = all 1.0)."""
+    if vol_lut is None or not len(times_ny):
+        return np.ones(len(times_ny))
+    minute_of_day_ny = (times_ny - times_ny.astype("datetime64[D]")).astype("timedelta64[m]").astype(np.int64)
+    minute_of_day_utc = (minute_of_day_ny - NY_UTC_OFFSET_HOURS*60) % (24*60)
+    return vol_lut[minute_of_day_utc]
+
 def simulate_series(num_candles: int, ticks_per_candle: int, minutes_per_candle: float,
                     tick_size: float, start_price: float, up_prob: float, *,
-                    start_time_ny=None, seed=None,
-                    session_volatility: Optional[List[Tuple[int,int,float]]]=None) -> List[Candle]:
-    rng = random.Random(seed)
+                    start_time_ny=None, seed=None, rng_kind: str = "pcg64",
+                    session_volatility: Optional[List[Tuple[int,int,float]]]=None,
+                    vol_lut: Optional[np.ndarray]=None) -> Series:
+    """Pass a prebuilt session_mult_lut() as vol_lut, or session_volatility to have it built here."""
+    rng = make_rng(seed, rng_kind)
+    if vol_lut is None and session_volatility: vol_lut = session_mult_lut(session_volatility)
     if start_time_ny is None: start_time_ny = ny_local_midnight_today()
     if is_in_skipped_hour_ny(start_time_ny):
         start_time_ny = start_time_ny.replace(hour=SKIP_HOUR_END_NY, minute=0, second=0, microsecond=0)
 
-    candles: List[Candle] = []
-    prev_close = start_price
-    cur_t = start_time_ny
-
-    for _ in range(num_candles):
-        mult = 1.0
-        if session_volatility:
-            minute_of_day_utc = ny_to_utc_minutes_of_day(cur_t)
-            for s_start, s_end, m in session_volatility:
-                if s_start <= s_end:
-                    in_win = s_start <= minute_of_day_utc < s_end
-                else:
-                    in_win = (minute_of_day_utc >= s_start) or (minute_of_day_utc < s_end)
-                if in_win:
-                    mult = max(mult, m)
-
-        o, h, l, c = simulate_candle(prev_close, ticks_per_candle, tick_size*mult, up_prob, rng)
-        candles.append(Candle(t=cur_t, o=o, h=h, l=l, c=c))
-        prev_close = c
-        cur_t = advance_ny_time_skipping_hour(cur_t, minutes_per_candle)
-    return candles
+    times = ny_times_skipping_hour(start_time_ny, num_candles, minutes_per_candle)
+    mults = session_multipliers(times, vol_lut)
+
+    o = np.empty(num_candles); h = np.empty(num_candles); l = np.empty(num_candles); c = np.empty(num_candles)
+    if isinstance(rng, random.Random):
+        prev_close = start_price
+        for i, mult in enumerate(mults):
+            o[i], h[i], l[i], c[i] = simulate_candle(prev_close, ticks_per_candle, tick_size*float(mult), up_prob, rng)
+            prev_close = c[i]
+    elif ticks_per_candle <= 0:  # no flips: every candle stays flat at the start price, like the tick loop
+        o[:] = h[:] = l[:] = c[:] = start_price
+    else:
+        # Flips are drawn in row blocks of ~1M ticks (same stream as per-candle draws)
+        core = _simulate_core if HAVE_NUMBA else _simulate_block_np
+        rows = max(1, (1 << 20) // max(1, ticks_per_candle))
+        price = start_price
+        for i in range(0, num_candles, rows):
+            ups = draw_ups(rng, (min(rows, num_candles - i), ticks_per_candle), up_prob); j = i + len(ups)
+            price = core(price, tick_size, mults[i:j], ups, o[i:j], h[i:j], l[i:j], c[i:j])
+    return Series(t=times, o=o, h=h, l=l, c=c)
+
+def simulate_batch(n_runs: int, *args, seed=None, max_workers: Optional[int] = None, **kwargs) -> List[Series]:
+    """n_runs independent simulate_series() runs (pcg64 only), one spawned child seed each.
+
+    Runs fan out over threads; NumPy draws and the nogil Numba kernels release the GIL.
+    """
+    if kwargs.get("rng_kind", "pcg64") != "pcg64":
+        raise ValueError(f"simulate_batch needs rng_kind='pcg64' (got '{kwargs['rng_kind']}'): child seeds are SeedSequences.")
+    children = np.random.SeedSequence(seed).spawn(n_runs)
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as ex:
+        return list(ex.map(lambda ss: simulate_series(*args, seed=ss, **kwargs), children))
 
 # ===================== Plotting =====================
-def draw_candles(ax, candles: List[Candle], title: str, *,
-                 up_color: str, down_color: str, chart_bg: str, show_grid: bool, pal: dict,
-                 session_markers: Optional[List[Tuple[float, str, str]]] = None):
-    ax.clear()
-    fg = pal["TXT"]; grid_rgba = _rgba(pal["TXT2"], 0.22); axis_col = pal["AXIS"]; fig_bg = pal["APP_BG"]
-    ax.set_facecolor(chart_bg or pal["CHART_BG_DEFAULT"]); ax.figure.set_facecolor(fig_bg)
-
-    xs = list(range(len(candles)))
-    for x, cd in zip(xs, candles):
-        color = up_color if cd.c >= cd.o else down_color
-        ax.vlines(x, cd.l, cd.h, linewidth=1.4, color=color, zorder=2)
-        top, bot = max(cd.o, cd.c), min(cd.o, cd.c)
-        body_h = max(top - bot, 1e-9)
-        ax.add_patch(plt.Rectangle((x - 0.34, bot), 0.68, body_h,
-                                   edgecolor=color, facecolor=color, linewidth=0.9, zorder=3))
-
-    stride = max(1, len(candles)//10) if len(candles) else 1
-    ax.set_xticks(xs[::stride]); ax.set_xticklabels([c.t.strftime("%H:%M") for c in candles[::stride]], color=fg)
-
-    if candles:
-        lows, highs = [c.l for c in candles], [c.h for c in candles]
-        pmin, pmax = min(lows), max(highs)
-        pad = (pmax - pmin) * 0.04 if pmax > pmin else 1.0
-        ax.set_ylim(pmin - pad, pmax + pad); ax.set_xlim(-1, len(candles))
-
+def candle_geometry(series: Series, i0: int, i1: int, px: int):
+    """Quads (2N, 4, 2) and up-mask (N,) for candles [i0, i1).
+
+    Wicks are thin quads, so wicks and bodies share one PolyCollection: the first
+    N quads are wicks, the next N bodies (wicks first so bodies paint over them).
+
+    When there are more than 2*px candles (px = axes width in pixels) they are
+    min/max-bucketed into px synthetic candles: first open, last close,
+    highest high, lowest low.
+    """
+    o, h, l, c = series.o[i0:i1], series.h[i0:i1], series.l[i0:i1], series.c[i0:i1]
+    n = i1 - i0
+    if px > 0 and n > 2 * px:
+        size = -(-n // px)
+        starts = np.arange(0, n, size); ends = np.minimum(starts + size, n)
+        o, c = o[starts], c[ends - 1]
+        h, l = np.maximum.reduceat(h, starts), np.minimum.reduceat(l, starts)
+        x = i0 + (starts + ends - 1) / 2.0; scale = (ends - starts).astype(np.float64)
+    else:
+        x = np.arange(i0, i1, dtype=np.float64); scale = np.ones(n)
+    up = c >= o
+    bot = np.minimum(o, c); top = bot + np.maximum(np.abs(c - o), 1e-9)
+    xc = np.concatenate([x, x]); half = np.concatenate([0.02 * scale, 0.34 * scale])
+    y0 = np.concatenate([l, bot]); y1 = np.concatenate([h, top])
+    verts = np.stack([np.column_stack([xc - half, y0]), np.column_stack([xc + half, y0]),
+                      np.column_stack([xc + half, y1]), np.column_stack([xc - half, y1])], axis=1)
+    return verts, up
+
+def candle_colors(up: np.ndarray, up_color: str, down_color: str) -> np.ndarray:
+    """Per-quad colors matching candle_geometry's [wicks..., bodies...] layout."""
+    colors = np.where(up, up_color, down_color)
+    return np.concatenate([colors, colors])
+
+class CandleArtists(NamedTuple):
+    candles: Optional["PolyCollection"]  # wicks + bodies
+    up: Optional[np.ndarray]  # up/down mask of the drawn (possibly bucketed) candles
+    markers: list             # session marker lines + labels
+
+def style_axes(ax, title: str, *, chart_bg: str, show_grid: bool, pal: dict):
+    """Apply theme colors, title and grid; safe to call again on an already drawn axes."""
+    fg = pal["TXT"]; axis_col = pal["AXIS"]
+    ax.set_facecolor(chart_bg or pal["CHART_BG_DEFAULT"]); ax.figure.set_facecolor(pal["APP_BG"])
     ax.set_title(title, color=fg, fontsize=13, fontweight="bold")
     ax.set_ylabel("Price", color=fg)
-    ax.grid(show_grid, alpha=1.0, linestyle="--", color=grid_rgba)
+    if show_grid: ax.grid(True, alpha=1.0, linestyle="--", color=pal["GRID_RGBA"])
+    else:         ax.grid(False)  # grid(False, **props) would switch it back on
     for s in ax.spines.values(): s.set_color(axis_col); s.set_linewidth(1.0)
     ax.tick_params(axis='y', colors=fg); ax.tick_params(axis='x', colors=fg)
 
-    # --- draw session markers (vertical dashed lines + labels) ---
+def draw_session_markers(ax, session_markers: Optional[List[Tuple[float, str, str]]]) -> list:
+    """Vertical dashed lines + labels at session boundaries; returns the artists for later removal."""
+    artists = []
     if session_markers:
         ymin, ymax = ax.get_ylim()
         ylab = ymax - (ymax - ymin) * 0.02  # near top
         for x, label, color in session_markers:
-            ax.axvline(x, color=color, linestyle="--", linewidth=1.1, alpha=0.9, zorder=1)
-            ax.text(x + 0.05, ylab, label, color=color, fontsize=9, rotation=90,
-                    va="top", ha="left", alpha=0.95, fontweight="bold", zorder=4)
+            artists.append(ax.axvline(x, color=color, linestyle="--", linewidth=1.1, alpha=0.9, zorder=1))
+            artists.append(ax.text(x + 0.05, ylab, label, color=color, fontsize=9, rotation=90,
+                                   va="top", ha="left", alpha=0.95, fontweight="bold", zorder=4, clip_on=True))
+    return artists
 
+def draw_candles(ax, series: Series, title: str, *,
+                 up_color: str, down_color: str, chart_bg: str, show_grid: bool, pal: dict,
+                 session_markers: Optional[List[Tuple[float, str, str]]] = None,
+                 prev: Optional[CandleArtists] = None) -> CandleArtists:
+    """Draw series on ax. Pass the previous result as prev to refill its collection in place
+    (set_verts) instead of clearing the axes and allocating new artists."""
+    n = len(series)
+    candles = up = None
+    reuse = n and prev is not None and prev.candles is not None and prev.candles.axes is ax
+    if reuse:
+        for a in prev.markers: a.remove()
+    else:
+        ax.clear()
+    if n:
+        # A single PolyCollection holds every wick and body: one artist, one draw call
+        verts, up = candle_geometry(series, 0, n, int(ax.bbox.width))
+        colors = candle_colors(up, up_color, down_color)
+        if reuse:
+            candles = prev.candles; candles.set_verts(verts)
+            candles.set_facecolor(colors); candles.set_edgecolor(colors)
+        else:
+            candles = ax.add_collection(PolyCollection(verts, facecolors=colors, edgecolors=colors,
+                                                       linewidths=0.9, zorder=3))
+            candles.set_rasterized(True)  # one bitmap instead of 2N vector paths in PDF/SVG exports
+
+    # The geometry above already covers the full range; keep xlim listeners from re-bucketing it
+    with ax.callbacks.blocked(signal="xlim_changed"):
+        stride = max(1, n//10) if n else 1
+        ax.set_xticks(np.arange(0, n, stride)); ax.set_xticklabels(series.hhmm[::stride])
+
+        if n:
+            pmin, pmax = float(series.l.min()), float(series.h.max())
+            pad = (pmax - pmin) * 0.04 if pmax > pmin else 1.0
+            ax.set_ylim(pmin - pad, pmax + pad); ax.set_xlim(-1, n)
+
+    style_axes(ax, title, chart_bg=chart_bg, show_grid=show_grid, pal=pal)
+    return CandleArtists(candles, up, draw_session_markers(ax, session_markers))
+
+def render_png(path: str, series: Series, title: str, *, figsize, dpi: int, **style):
+    """Draw series on a private Agg figure and save it as a PNG.
+
+    No figure or artist is shared with the on-screen chart, but matplotlib's font and
+    text caches are, and matplotlib is not thread-safe: off the Tk thread this runs
+    under _mpl_lock. The App paints the screen before queuing the export, so the
+    post-Generate repaint never waits on it; a zoom or resize redraw during an
+    export does wait until the PNG is written.
+    style: the draw_candles() keyword arguments.
+    """
+    _import_matplotlib()
+    with _mpl_lock:
+        fig = Figure(figsize=figsize, dpi=dpi); FigureCanvasAgg(fig)
+        draw_candles(fig.add_subplot(111), series, title, **style)
+        fig.tight_layout(); fig.savefig(path)
+
+@functools.lru_cache(maxsize=64)
 def _rgba(hex_color: str, alpha: float):
-    hex_color = hex_color.lstrip("#")
-    r = int(hex_color[0:2], 16)/255.0; g = int(hex_color[2:4], 16)/255.0; b = int(hex_color[4:6], 16)/255.0
-    return (r, g, b, alpha)
+    v = int(hex_color.lstrip("#")[:6], 16)  # one parse, then mask out the channels
+    return (((v >> 16) & 0xFF)/255.0, ((v >> 8) & 0xFF)/255.0, (v & 0xFF)/255.0, alpha)
 
 # ===================== Settings / Presets =====================
 BASE_DIR = os.path.dirname(__file__)
@@ -192,20 +446,25 @@ CONFIGS_DIR = os.path.join(BASE_DIR, "Configs")
 
 def load_settings():
     try:
-        with open(SETTINGS_FILE, "r", encoding="utf-8") as f: return json.load(f)
+        with open(SETTINGS_FILE, "rb") as f: return _loads(f.read())
     except Exception: return {}
 
+_settings_lock = threading.Lock()  # the background writer and the quit-time save share one temp file
+
 def save_settings(d: dict):
+    """Write to a temp file and os.replace() it in, so a crash never leaves half a settings.json."""
+    tmp = SETTINGS_FILE + ".tmp"
     try:
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f: json.dump(d, f, indent=2)
+        with _settings_lock:
+            with open(tmp, "wb") as f: f.write(_dumps(d))
+            os.replace(tmp, SETTINGS_FILE)
     except Exception: pass
 
 def ensure_configs_dir(): os.makedirs(CONFIGS_DIR, exist_ok=True)
 def list_presets() -> List[str]:
-    ensure_configs_dir(); names=[]
-    for fn in sorted(os.listdir(CONFIGS_DIR)):
-        if fn.lower().endswith(".json"): names.append(os.path.splitext(fn)[0])
-    return names
+    ensure_configs_dir()
+    paths = glob.glob(os.path.join(glob.escape(CONFIGS_DIR), "*.json"))  # scandir-backed, no per-entry stat
+    return sorted(os.path.splitext(os.path.basename(p))[0] for p in paths)
 def preset_path(name: str) -> str:
     ensure_configs_dir()
     safe = "".join(ch if ch.isalnum() or ch in "-_ " else "_" for ch in name).strip() or "preset"
@@ -243,12 +502,14 @@ class App(tk.Tk):
     def __init__(self):
         super().__init__()
         self.settings = load_settings()
+        self._save_q = queue.Queue(maxsize=1)  # latest pending settings snapshot only
+        threading.Thread(target=self._settings_writer, daemon=True).start()
         self.title("CoinKoo — Coin-Flip Candlestick Generator")
         self.geometry("1240x810"); self.minsize(1080, 700)
 
         # Theme
         self.theme_choice = tk.StringVar(value=self.settings.get("theme", "Dark Sleek"))
-        self.palette = get_palette(self.theme_choice.get())
+        self._load_palette()
 
         # Simulation
         self.var_num = tk.StringVar(value=str(self.settings.get("num_candles", 100)))
@@ -261,6 +522,7 @@ class App(tk.Tk):
         self.var_up_prob = tk.StringVar(value=str(self.settings.get("up_prob", 0.5)))
         self.var_seed = tk.StringVar(value=str(self.settings.get("seed", "")))
         self.var_auto_seed = tk.BooleanVar(value=self.settings.get("auto_seed", False))
+        self.var_rng = tk.StringVar(value=self.settings.get("rng", "pcg64"))
 
         # Style (defaults per theme)
         saved_up = self.settings.get("up_color"); saved_down = self.settings.get("down_color")
@@ -277,6 +539,7 @@ class App(tk.Tk):
         # Output
         self.var_custom_name = tk.BooleanVar(value=self.settings.get("custom_name_on", False))
         self.var_name = tk.StringVar(value=self.settings.get("custom_name", ""))
+        self.var_dpi = tk.StringVar(value=str(self.settings.get("dpi", 120)))
 
         # Advanced
         self.var_adv_on = tk.BooleanVar(value=self.settings.get("adv_on", False))
@@ -287,8 +550,12 @@ class App(tk.Tk):
         self.var_full_day = tk.BooleanVar(value=self.settings.get("full_day", False))
 
         # State
-        self.last_candles: List[Candle] = []; self.last_title: str = "Preview"
+        self.last_series: Series = Series.empty(); self.last_title: str = "Preview"
         self.last_dir = None; self.last_png = None; self.last_csv = None
+        self._pending_redraw = None; self._pending_eff_label = False; self._traces_suspended = False
+        self._exec = ThreadPoolExecutor(max_workers=1); self._generating = False  # generate + PNG export, in order
+        self._results: queue.Queue = queue.Queue()  # worker → Tk callbacks, drained by _drain_results
+        self._preset_cache: Optional[List[str]] = None  # invalidated on preset save/delete
 
         # Styles
         self.style = ttk.Style()
@@ -301,7 +568,7 @@ class App(tk.Tk):
         self._bind_shortcuts()
         self._update_eff_label()
         self._refresh_presets_list()
-        self._redraw_current()
+        self._first_map = self.bind("<Map>", self._on_first_map, add="+")
 
         self.theme_choice.trace_add("write", lambda *_: self._on_theme_change())
 
@@ -415,7 +682,7 @@ class App(tk.Tk):
         ttk.Label(tr, text="Theme:").pack(side=tk.LEFT)
         self.cmb_theme = ttk.Combobox(tr, values=["Vintage", "Dark Sleek"], state="readonly", width=12, textvariable=self.theme_choice)
         self.cmb_theme.pack(side=tk.LEFT, padx=(6,0))
-        ttk.Checkbutton(tr, text="Show grid", variable=self.var_show_grid, command=self._redraw_current).pack(side=tk.LEFT, padx=(10,0))
+        ttk.Checkbutton(tr, text="Show grid", variable=self.var_show_grid, command=self._schedule_redraw).pack(side=tk.LEFT, padx=(10,0))
 
         # Tabs
         nb = ttk.Notebook(left); nb.pack(fill=tk.BOTH, expand=True)
@@ -446,6 +713,9 @@ class App(tk.Tk):
         ttk.Label(seed_row, text="Random seed").pack(side=tk.LEFT)
         ttk.Entry(seed_row, textvariable=self.var_seed, width=12).pack(side=tk.LEFT, padx=(8,0))
         ttk.Checkbutton(seed_row, text="Auto-seed", variable=self.var_auto_seed).pack(side=tk.LEFT, padx=(10,0))
+        ttk.Label(seed_row, text="RNG").pack(side=tk.LEFT, padx=(10,0))
+        ttk.Combobox(seed_row, values=list(RNG_KINDS), state="readonly", width=8,
+                     textvariable=self.var_rng).pack(side=tk.LEFT, padx=(6,0))
 
         # Style
         sty = Card(tab_controls, self.palette); sty.pack(fill=tk.X, pady=10); self._cards.append(sty)
@@ -472,6 +742,9 @@ class App(tk.Tk):
         self.entry_name = ttk.Entry(oc, textvariable=self.var_name, width=22)
         self.entry_name.pack(side=tk.LEFT, padx=(8,0))
         self._toggle_custom()
+        od = ttk.Frame(out_in); od.pack(fill=tk.X, pady=2)
+        ttk.Label(od, text="PNG DPI").pack(side=tk.LEFT)
+        ttk.Entry(od, textvariable=self.var_dpi, width=6).pack(side=tk.LEFT, padx=(8,0))
 
         # Presets
         cfg = Card(tab_controls, self.palette); cfg.pack(fill=tk.X, pady=10); self._cards.append(cfg)
@@ -513,14 +786,14 @@ class App(tk.Tk):
 
         rowL = ttk.Frame(adv_in); rowL.pack(fill=tk.X, pady=3)
         self.chk_lon = ttk.Checkbutton(rowL, text="Boost London session", variable=self.var_adv_london,
-                                       command=self._redraw_current)
+                                       command=self._schedule_redraw)
         self.chk_lon.pack(side=tk.LEFT)
         ttk.Label(rowL, text="×").pack(side=tk.LEFT, padx=(8,2))
         self.ent_lon = ttk.Entry(rowL, textvariable=self.var_adv_lon_mult, width=8); self.ent_lon.pack(side=tk.LEFT)
 
         rowN = ttk.Frame(adv_in); rowN.pack(fill=tk.X, pady=3)
         self.chk_ny = ttk.Checkbutton(rowN, text="Boost New York session", variable=self.var_adv_ny,
-                                      command=self._redraw_current)
+                                      command=self._schedule_redraw)
         self.chk_ny.pack(side=tk.LEFT)
         ttk.Label(rowN, text="×").pack(side=tk.LEFT, padx=(8,2))
         self.ent_ny = ttk.Entry(rowN, textvariable=self.var_adv_ny_mult, width=8); self.ent_ny.pack(side=tk.LEFT)
@@ -536,17 +809,17 @@ class App(tk.Tk):
 
         # RIGHT (chart)
         right_card = Card(outer, self.palette); right_card.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True); self._cards.append(right_card)
-        chart_wrap = ttk.Frame(right_card.inner, padding=10); chart_wrap.pack(fill=tk.BOTH, expand=True)
-        self.fig, self.ax = plt.subplots(figsize=(9.6, 6.1), dpi=110)
-        self.canvas = FigureCanvasTkAgg(self.fig, master=chart_wrap)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self._chart_wrap = ttk.Frame(right_card.inner, padding=10); self._chart_wrap.pack(fill=tk.BOTH, expand=True)
+        self.fig = self.ax = self.canvas = None  # built by _ensure_figure() once the window is up
 
-        # Zoom controls
-        self._connect_zoom_controls()
+        # Blitting: candle collections are animated and painted over a cached background,
+        # which is re-captured after every full draw (resize, zoom, data change)
+        self._candle_pc = self._candle_up = None; self._candle_span = None; self._bg = None; self._xlim_cid = None
+        self._drawn_series: Optional[Series] = None; self._marker_artists: list = []
 
         # live eff label updates
         for v in (self.var_tf, self.var_base, self.var_override, self.var_eff):
-            v.trace_add("write", lambda *_: self._update_eff_label())
+            v.trace_add("write", lambda *_: self._schedule_eff_label())
 
         self._refresh_advanced_enabled()
         self._refresh_full_day_state()
@@ -557,8 +830,13 @@ class App(tk.Tk):
         return row.widget
 
     # ---------- Theme handling ----------
+    def _load_palette(self):
+        self.palette = pal = get_palette(self.theme_choice.get())
+        self._status_fg = {True: pal["TXT"], False: "#f87171"}  # resolved per theme change, not per status update
+
     def _on_theme_change(self):
-        self.palette = get_palette(self.theme_choice.get())
+        if self._traces_suspended: return
+        self._load_palette()
         if self.theme_choice.get().lower() == "dark sleek":
             if self.var_up_color.get().lower() in ["#000000", "black"]:
                 self.var_up_color.set("#22C55E"); self.btn_upc.config(text=self.var_up_color.get())
@@ -566,23 +844,23 @@ class App(tk.Tk):
                 self.var_chart_bg.set("#FFFFFF"); self.btn_bg.config(text=self.var_chart_bg.get())
         self._apply_styles(); self._update_all_cards()
         self.btn_upc.config(text=self.var_up_color.get()); self.btn_dwc.config(text=self.var_down_color.get()); self.btn_bg.config(text=self.var_chart_bg.get())
-        self._redraw_current()
+        self._schedule_redraw()
 
     # ---------- Color pickers ----------
     def _pick_up(self):
         c = colorchooser.askcolor(color=self.var_up_color.get(), title="Pick Up Candle Color")[1]
-        if c: self.var_up_color.set(c); self.btn_upc.config(text=c); self._redraw_current()
+        if c: self.var_up_color.set(c); self.btn_upc.config(text=c); self._restyle_candles()
     def _pick_down(self):
         c = colorchooser.askcolor(color=self.var_down_color.get(), title="Pick Down Candle Color")[1]
-        if c: self.var_down_color.set(c); self.btn_dwc.config(text=c); self._redraw_current()
+        if c: self.var_down_color.set(c); self.btn_dwc.config(text=c); self._restyle_candles()
     def _pick_bg(self):
         c = colorchooser.askcolor(color=self.var_chart_bg.get(), title="Pick Chart Background")[1]
-        if c: self.var_chart_bg.set(c); self.btn_bg.config(text=c); self._redraw_current()
+        if c: self.var_chart_bg.set(c); self.btn_bg.config(text=c); self._schedule_redraw()
 
     # ---------- UI toggles ----------
     def _toggle_override(self):
         self.entry_eff.configure(state=(tk.NORMAL if self.var_override.get() else tk.DISABLED))
-        self._update_eff_label()
+        self._schedule_eff_label()
     def _toggle_custom(self):
         self.entry_name.configure(state=(tk.NORMAL if self.var_custom_name.get() else tk.DISABLED))
 
@@ -592,8 +870,8 @@ class App(tk.Tk):
                   getattr(self, "chk_ny", None), getattr(self, "ent_ny", None),
                   getattr(self, "chk_full", None)):
             if w: w.configure(state=state)
-        # Redraw so markers appear/disappear instantly
-        self._redraw_current()
+        # Redraw so markers appear/disappear
+        self._schedule_redraw()
 
     def _refresh_full_day_state(self):
         if self.var_full_day.get():
@@ -603,7 +881,14 @@ class App(tk.Tk):
             self.entry_num.configure(state=tk.NORMAL)
             self.status.configure(text="Ready.")
 
+    def _schedule_eff_label(self):
+        """Coalesce a burst of Tk variable writes into one label update when the loop goes idle."""
+        if self._pending_eff_label or self._traces_suspended: return
+        self._pending_eff_label = True
+        self.after_idle(self._update_eff_label)
+
     def _update_eff_label(self):
+        self._pending_eff_label = False
         try:
             tf = max(0.1, float(self.var_tf.get())); base = max(1, int(float(self.var_base.get())))
             if self.var_override.get():
@@ -616,84 +901,164 @@ class App(tk.Tk):
             self.eff_label.config(text="Effective ticks/candle: —")
 
     # ---------- Session markers ----------
-    def _compute_session_markers(self, candles: List[Candle]) -> List[Tuple[float, str, str]]:
-        """Return list of (x_position, label, color) for LDN/NY open/close boundaries."""
+    def _session_marker_flags(self) -> Tuple[bool, bool]:
+        """(show_ldn, show_ny) as currently set on the Advanced tab."""
+        adv = self.var_adv_on.get()
+        return adv and self.var_adv_london.get(), adv and self.var_adv_ny.get()
+
+    def _compute_session_markers(self, series: Series,
+                                 flags: Optional[Tuple[bool, bool]] = None) -> List[Tuple[float, str, str]]:
+        """Return list of (x_position, label, color) for LDN/NY open/close boundaries.
+
+        flags: a _session_marker_flags() snapshot; None reads the Advanced tab now.
+        """
         markers: List[Tuple[float, str, str]] = []
-        if not candles or not self.var_adv_on.get():
+        show_ldn, show_ny = flags if flags is not None else self._session_marker_flags()
+        if not len(series) or not (show_ldn or show_ny):
             return markers
 
-        show_ldn = self.var_adv_london.get()
-        show_ny  = self.var_adv_ny.get()
-
         # Colors chosen to be visible in both themes
         col_ldn = "#F59E0B"   # amber
         col_ny  = "#60A5FA"   # light blue
 
-        # Iterate consecutive candle times in UTC and test crossings
-        times_ny = [c.t for c in candles]
-        times_utc = [ny_to_utc_dt(t) for t in times_ny]
-
-        for i in range(1, len(times_utc)):
-            t0, t1 = times_utc[i-1], times_utc[i]
-            if t1 <= t0:
-                continue
-
-            # Check boundaries for both dates that span this segment
-            dates_to_check = {t0.date(), t1.date()}
-            for d in list(dates_to_check):
-                # London session boundaries
-                if show_ldn:
-                    ldn_open = datetime.combine(d, dtime(8, 0))
-                    ldn_close = datetime.combine(d, dtime(17, 0))
-                    if t0 < ldn_open <= t1:
-                        frac = (ldn_open - t0).total_seconds() / (t1 - t0).total_seconds()
-                        markers.append(( (i-1) + frac, "LDN open", col_ldn ))
-                    if t0 < ldn_close <= t1:
-                        frac = (ldn_close - t0).total_seconds() / (t1 - t0).total_seconds()
-                        markers.append(( (i-1) + frac, "LDN close", col_ldn ))
-
-                # New York session boundaries
-                if show_ny:
-                    ny_open = datetime.combine(d, dtime(13, 30))
-                    ny_close = datetime.combine(d, dtime(20, 0))
-                    if t0 < ny_open <= t1:
-                        frac = (ny_open - t0).total_seconds() / (t1 - t0).total_seconds()
-                        markers.append(( (i-1) + frac, "NY open", col_ny ))
-                    if t0 < ny_close <= t1:
-                        frac = (ny_close - t0).total_seconds() / (t1 - t0).total_seconds()
-                        markers.append(( (i-1) + frac, "NY close", col_ny ))
+        # Each boundary lands in the candle interval found by a binary search over the UTC times
+        t = series.t - np.timedelta64(NY_UTC_OFFSET_HOURS, "h")
+        days = np.arange(t[0].astype("datetime64[D]"), t[-1].astype("datetime64[D]") + np.timedelta64(1, "D"))
+        sessions = []
+        if show_ldn: sessions += [(8*60, "LDN open", col_ldn), (17*60, "LDN close", col_ldn)]
+        if show_ny:  sessions += [(13*60+30, "NY open", col_ny), (20*60, "NY close", col_ny)]
+        for minute, label, color in sessions:
+            b = (days + np.timedelta64(minute, "m")).astype(t.dtype)
+            i = np.searchsorted(t, b)  # t[i-1] < b <= t[i]
+            ok = (i >= 1) & (i < len(t)); i, b = i[ok], b[ok]
+            x = (i - 1) + (b - t[i-1]) / (t[i] - t[i-1])
+            markers += [(x_, label, color) for x_ in x.tolist()]
 
         # Sort by x for consistent layering
         markers.sort(key=lambda m: m[0])
         return markers
 
     # ---------- Render ----------
+    def _on_first_map(self, event):
+        if event.widget is not self: return
+        self.unbind("<Map>", self._first_map)
+        self.after_idle(self._redraw_current)  # first chart (and matplotlib import) after the window paints
+
+    def _ensure_figure(self):
+        if self.fig is not None: return
+        _import_matplotlib()
+        self.fig = Figure(figsize=(9.6, 6.1), dpi=110); self.ax = self.fig.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self._chart_wrap)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_canvas_draw)
+        self._connect_zoom_controls()
+
+    def _schedule_redraw(self):
+        """Debounce redraw requests: a burst of toggles/picks within 60 ms renders once."""
+        if self._pending_redraw: self.after_cancel(self._pending_redraw)
+        self._pending_redraw = self.after(60, self._redraw_current)
+
     def _redraw_current(self):
-        candles = self.last_candles
-        title = self.last_title if candles else "Preview"
-        session_markers = self._compute_session_markers(candles)
-        draw_candles(
-            self.ax,
-            candles,
-            title,
-            up_color=self.var_up_color.get(),
-            down_color=self.var_down_color.get(),
-            chart_bg=self.var_chart_bg.get(),
-            show_grid=self.var_show_grid.get(),
-            pal=self.palette,
-            session_markers=session_markers,
-        )
-        self.fig.tight_layout()
+        series = self.last_series
+        self._render(series, self.last_title if len(series) else "Preview")
         self.canvas.draw_idle()
 
+    def _render(self, series: Series, title: str):
+        """The one place the chart is (re)built: restyle in place for the drawn series, else draw it.
+
+        Any scheduled redraw is dropped, since this render already reflects the current state.
+        The caller decides when to paint (draw_idle) or export (savefig).
+        """
+        self._ensure_figure()
+        if self._pending_redraw:
+            self.after_cancel(self._pending_redraw); self._pending_redraw = None
+        session_markers = self._compute_session_markers(series)
+        with _mpl_lock:  # draw_candles/tight_layout lay out text; see render_png
+            if series is self._drawn_series and self._candle_pc is not None:
+                # Same data: restyle the cached artists in place instead of clearing the axes
+                style_axes(self.ax, title, chart_bg=self.var_chart_bg.get(),
+                           show_grid=self.var_show_grid.get(), pal=self.palette)
+                self._color_candles()
+                for a in self._marker_artists: a.remove()
+                self._marker_artists = draw_session_markers(self.ax, session_markers)
+            else:
+                self._set_candle_artists(draw_candles(
+                    self.ax,
+                    series,
+                    title,
+                    up_color=self.var_up_color.get(),
+                    down_color=self.var_down_color.get(),
+                    chart_bg=self.var_chart_bg.get(),
+                    show_grid=self.var_show_grid.get(),
+                    pal=self.palette,
+                    session_markers=session_markers,
+                    prev=self._drawn_artists(),
+                ), series)
+            self.fig.tight_layout()
+
+    def _drawn_artists(self) -> CandleArtists:
+        return CandleArtists(self._candle_pc, self._candle_up, self._marker_artists)
+
+    def _set_candle_artists(self, artists: CandleArtists, series: Series):
+        self._candle_pc, self._candle_up, self._marker_artists = artists
+        self._drawn_series = series; self._bg = None  # new data: background is stale until the next draw
+        self._candle_span = (0, len(series), int(self.ax.bbox.width))
+        if self._candle_pc is not None:  # ax.clear() drops callbacks, so reconnect per draw (once)
+            self._candle_pc.set_animated(True)
+            if self._xlim_cid is not None: self.ax.callbacks.disconnect(self._xlim_cid)
+            self._xlim_cid = self.ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+
+    def _on_xlim_changed(self, ax):
+        """Re-bucket only the visible candles after zoom/pan so detail returns as you zoom in.
+
+        The cached collection is updated in place, and only when the visible span or
+        axes width actually changed (pans within the same candles are free).
+        """
+        n = len(self.last_series)
+        if self._candle_pc is None or not n: return
+        x0, x1 = ax.get_xlim()
+        i0 = max(0, int(np.floor(x0))); i1 = min(n, int(np.ceil(x1)) + 1)
+        span = (i0, i1, int(ax.bbox.width))
+        if i1 <= i0 or span == self._candle_span: return
+        self._candle_span = span; self._bg = None  # ticks/limits moved with the view
+        verts, self._candle_up = candle_geometry(self.last_series, i0, i1, int(ax.bbox.width))
+        self._candle_pc.set_verts(verts)
+        self._color_candles()
+
+    def _color_candles(self):
+        colors = candle_colors(self._candle_up, self.var_up_color.get(), self.var_down_color.get())
+        self._candle_pc.set_facecolor(colors); self._candle_pc.set_edgecolor(colors)
+
+    def _on_canvas_draw(self, event):
+        if event.canvas.is_saving(): return  # savefig renders at export dpi (maybe on a vector canvas), not the screen buffer
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._blit_candles(restore=False)
+
+    def _blit_candles(self, restore: bool = True):
+        with _mpl_lock:
+            if restore: self.canvas.restore_region(self._bg)
+            if self._candle_pc is not None: self.ax.draw_artist(self._candle_pc)
+            self.canvas.blit(self.ax.bbox)
+
+    def _restyle_candles(self):
+        """Recolor the existing candle collections and blit them over the cached background."""
+        if self._bg is None or self._candle_pc is None or not len(self.last_series):
+            self._schedule_redraw(); return
+        self._color_candles()
+        self._blit_candles()
+
     # ---------- Actions ----------
     def on_generate(self, *_):
+        """Validate inputs here; simulate + CSV run on the worker, drawing resumes in _on_generate_done."""
+        if self._generating:  # cleared on the Tk thread once the PNG status (or an error) is shown
+            self._set_status("Still generating…", ok=True); return
         try:
             tf = self._as_float(self.var_tf.get(), "Timeframe (minutes)", 0.1)
             base = self._as_int(self.var_base.get(), "Base ticks per 1-minute", 1)
             tick_size = self._as_float(self.var_tick_size.get(), "Tick size", 1e-12)
             start_price = self._as_float(self.var_start_price.get(), "Start price")
             up_prob = self._as_float(self.var_up_prob.get(), "Up probability", 0.0, 1.0)
+            dpi = self._as_int(self.var_dpi.get(), "PNG DPI", 50, 600)
 
             if self.var_auto_seed.get():
                 seed = int(datetime.now().timestamp()); self.var_seed.set(str(seed))
@@ -714,7 +1079,7 @@ class App(tk.Tk):
             else:
                 num = self._as_int(self.var_num.get(), "Number of candles", 1)
 
-            # Session volatility (UTC minutes-of-day)
+            # Session volatility (UTC minutes-of-day) → per-minute multiplier table
             session_vol = None
             if self.var_adv_on.get():
                 session_vol = []
@@ -724,8 +1089,9 @@ class App(tk.Tk):
                 if self.var_adv_ny.get():
                     m = max(1.0, float(self.var_adv_ny_mult.get() or 1.0))
                     session_vol.append((13*60+30, 20*60, m))  # NY 13:30–20:00 UTC
+            vol_lut = session_mult_lut(session_vol) if session_vol else None
 
-            candles = simulate_series(
+            sim_kwargs = dict(
                 num_candles=num,
                 ticks_per_candle=eff,
                 minutes_per_candle=tf,
@@ -734,7 +1100,8 @@ class App(tk.Tk):
                 up_prob=up_prob,
                 start_time_ny=start_time_ny,
                 seed=seed,
-                session_volatility=session_vol
+                rng_kind=self.var_rng.get(),
+                vol_lut=vol_lut
             )
 
             # Outputs
@@ -746,24 +1113,69 @@ class App(tk.Tk):
             csv_path = os.path.join(out_dir, "data.csv")
 
             title = f"Coin-Flip Chart (NY time UTC−4) — {num} candles, tf={tf}m, ticks/candle={eff} [{src}]"
-            self.last_candles, self.last_title = candles, title
-            self.last_dir, self.last_png, self.last_csv = out_dir, png_path, csv_path
+            # The PNG is styled as of this click, like the CSV, even if the UI changes mid-run
+            style = dict(up_color=self.var_up_color.get(), down_color=self.var_down_color.get(),
+                         chart_bg=self.var_chart_bg.get(), show_grid=self.var_show_grid.get(), pal=self.palette)
+            outputs = (title, out_dir, png_path, csv_path, dpi, style, self._session_marker_flags())
 
-            # Draw and save
-            session_markers = self._compute_session_markers(candles)
-            draw_candles(self.ax, candles, title,
-                         up_color=self.var_up_color.get(), down_color=self.var_down_color.get(),
-                         chart_bg=self.var_chart_bg.get(), show_grid=self.var_show_grid.get(),
-                         pal=self.palette, session_markers=session_markers)
-            self.fig.tight_layout(); self.canvas.draw_idle()
+            self._set_status("Generating…", ok=True)
+            future = self._exec.submit(self._simulate_and_save, sim_kwargs, csv_path)
+            self._generating = True; self.after(50, self._drain_results)
+            future.add_done_callback(lambda f: self._post(self._on_generate_done, f, outputs))
 
-            self.fig.savefig(png_path, dpi=170); self._save_csv(candles, csv_path)
+        except Exception as e:
+            self._set_status(str(e), ok=False); messagebox.showerror("Error", str(e))
 
-            self._set_status(f"Saved PNG → {png_path}\nSaved CSV → {csv_path}", ok=True)
-            self._persist()
+    def _simulate_and_save(self, sim_kwargs: dict, csv_path: str) -> Series:
+        """Worker thread: no Tk access here."""
+        series = simulate_series(**sim_kwargs)
+        self._save_csv(series, csv_path)
+        return series
+
+    def _on_generate_done(self, future, outputs):
+        title, out_dir, png_path, csv_path, dpi, style, marker_flags = outputs
+        try:
+            series = future.result()
+            self.last_series = series; self.last_title = title
+            self.last_dir, self.last_png, self.last_csv = out_dir, png_path, csv_path
 
+            # Draw on screen; the PNG renders on its own figure on the worker
+            self._render(series, title); self.canvas.draw()  # paint now, not queued behind the export's lock
+            style = dict(style, session_markers=self._compute_session_markers(series, marker_flags))
+            self._exec.submit(self._export_png, png_path, csv_path, series, title, style,
+                              figsize=tuple(self.fig.get_size_inches()), dpi=dpi)
+        except Exception as e:  # nothing left to report back, so Generate must not stay busy
+            self._generating = False
+            self._set_status(str(e), ok=False); messagebox.showerror("Error", str(e)); return
+
+        self._set_status(f"Saving PNG → {png_path}\nSaved CSV → {csv_path}", ok=True)
+        self._persist()
+
+    def _post(self, fn, *args):
+        """Queue fn(*args) for the Tk thread. Workers never call into Tcl (not even after()),
+        so a Tk thread blocked on the executor (see _quit) can't deadlock with them."""
+        self._results.put((fn, args))
+
+    def _drain_results(self):
+        """Tk thread: run queued worker callbacks, polling until the current job is done."""
+        while True:
+            try: fn, args = self._results.get_nowait()
+            except queue.Empty: break
+            fn(*args)
+        if self._generating: self.after(50, self._drain_results)
+
+    def _export_png(self, png_path: str, csv_path: str, series: Series, title: str, style: dict, *, figsize, dpi: int):
+        """Worker thread: render the PNG, then report back on the Tk thread."""
+        try:
+            render_png(png_path, series, title, figsize=figsize, dpi=dpi, **style)
+            msg, ok = f"Saved PNG → {png_path}\nSaved CSV → {csv_path}", True
         except Exception as e:
-            self._set_status(str(e), ok=False); messagebox.showerror("Error", str(e))
+            msg, ok = f"PNG export failed: {e}", False
+        self._post(self._on_export_done, msg, ok)
+
+    def _on_export_done(self, msg: str, ok: bool):
+        self._generating = False
+        self._set_status(msg, ok)
 
     def open_last(self, *_):
         if not self.last_dir or not os.path.isdir(self.last_dir):
@@ -790,13 +1202,12 @@ class App(tk.Tk):
         w.bind("<KeyPress-minus>", lambda e: self._zoom_keyboard(False))
 
     def _autoscale_view(self):
-        cds = self.last_candles
-        if not cds: return
-        lows, highs = [c.l for c in cds], [c.h for c in cds]
-        pmin, pmax = (min(lows), max(highs)) if lows else (0, 1)
+        series = self.last_series
+        if not len(series): return
+        pmin, pmax = float(series.l.min()), float(series.h.max())
         pad = (pmax - pmin) * 0.04 if pmax > pmin else 1.0
         self.ax.set_ylim(pmin - pad, pmax + pad)
-        self.ax.set_xlim(-1, len(cds))
+        self.ax.set_xlim(-1, len(series))
         self.canvas.draw_idle()
 
     def _on_mpl_doubleclick(self, event):
@@ -833,8 +1244,8 @@ class App(tk.Tk):
         new_y0 = y_anchor - (y_anchor - y0) * scale
         new_y1 = y_anchor + (y1 - y_anchor) * scale
 
-        if self.last_candles:
-            xmin_cap, xmax_cap = -1.0, float(len(self.last_candles))
+        if len(self.last_series):
+            xmin_cap, xmax_cap = -1.0, float(len(self.last_series))
             span_min_x = 0.5
             if new_x1 - new_x0 < span_min_x:
                 mid = (new_x0 + new_x1) / 2.0
@@ -864,12 +1275,14 @@ class App(tk.Tk):
             "up_prob": float(self.var_up_prob.get() or 0.5),
             "seed": self.var_seed.get(),
             "auto_seed": self.var_auto_seed.get(),
+            "rng": self.var_rng.get(),
             "up_color": self.var_up_color.get(),
             "down_color": self.var_down_color.get(),
             "chart_bg": self.var_chart_bg.get(),
             "grid": self.var_show_grid.get(),
             "custom_name_on": self.var_custom_name.get(),
             "custom_name": self.var_name.get(),
+            "dpi": int(float(self.var_dpi.get() or 120)),
             "adv_on": self.var_adv_on.get(),
             "adv_london": self.var_adv_london.get(),
             "adv_ny": self.var_adv_ny.get(),
@@ -878,36 +1291,46 @@ class App(tk.Tk):
             "full_day": self.var_full_day.get(),
         }
 
+    @contextmanager
+    def _suspend_traces(self):
+        """Mute trace-driven refreshes while many variables are set; the caller refreshes once after."""
+        self._traces_suspended = True
+        try: yield
+        finally: self._traces_suspended = False
+
     def apply_config(self, cfg: dict):
-        self.theme_choice.set(cfg.get("theme", self.theme_choice.get()))
-        self.palette = get_palette(self.theme_choice.get())
-        self.var_num.set(str(cfg.get("num_candles", 100)))
-        self.var_tf.set(str(cfg.get("timeframe", 1.0)))
-        self.var_base.set(str(cfg.get("base_ticks", 30)))
-        self.var_override.set(bool(cfg.get("override", False)))
-        self.var_eff.set(str(cfg.get("eff_ticks", "")))
-        self.var_tick_size.set(str(cfg.get("tick_size", 1.0)))
-        self.var_start_price.set(str(cfg.get("start_price", 10000)))
-        self.var_up_prob.set(str(cfg.get("up_prob", 0.5)))
-        self.var_seed.set(str(cfg.get("seed", "")))
-        self.var_auto_seed.set(bool(cfg.get("auto_seed", False)))
-        self.var_up_color.set(cfg.get("up_color", self.var_up_color.get()))
-        self.var_down_color.set(cfg.get("down_color", self.var_down_color.get()))
-        self.var_chart_bg.set(cfg.get("chart_bg", self.var_chart_bg.get()))
-        self.var_show_grid.set(bool(cfg.get("grid", True)))
-        self.var_custom_name.set(bool(cfg.get("custom_name_on", False)))
-        self.var_name.set(cfg.get("custom_name", ""))
-        self.var_adv_on.set(bool(cfg.get("adv_on", False)))
-        self.var_adv_london.set(bool(cfg.get("adv_london", True)))
-        self.var_adv_ny.set(bool(cfg.get("adv_ny", True)))
-        self.var_adv_lon_mult.set(str(cfg.get("adv_lon_mult", 1.5)))
-        self.var_adv_ny_mult.set(str(cfg.get("adv_ny_mult", 1.5)))
-        self.var_full_day.set(bool(cfg.get("full_day", False)))
+        with self._suspend_traces():  # one refresh below instead of one per variable write
+            self.theme_choice.set(cfg.get("theme", self.theme_choice.get()))
+            self._load_palette()
+            self.var_num.set(str(cfg.get("num_candles", 100)))
+            self.var_tf.set(str(cfg.get("timeframe", 1.0)))
+            self.var_base.set(str(cfg.get("base_ticks", 30)))
+            self.var_override.set(bool(cfg.get("override", False)))
+            self.var_eff.set(str(cfg.get("eff_ticks", "")))
+            self.var_tick_size.set(str(cfg.get("tick_size", 1.0)))
+            self.var_start_price.set(str(cfg.get("start_price", 10000)))
+            self.var_up_prob.set(str(cfg.get("up_prob", 0.5)))
+            self.var_seed.set(str(cfg.get("seed", "")))
+            self.var_auto_seed.set(bool(cfg.get("auto_seed", False)))
+            self.var_rng.set(cfg.get("rng", "pcg64"))
+            self.var_up_color.set(cfg.get("up_color", self.var_up_color.get()))
+            self.var_down_color.set(cfg.get("down_color", self.var_down_color.get()))
+            self.var_chart_bg.set(cfg.get("chart_bg", self.var_chart_bg.get()))
+            self.var_show_grid.set(bool(cfg.get("grid", True)))
+            self.var_custom_name.set(bool(cfg.get("custom_name_on", False)))
+            self.var_name.set(cfg.get("custom_name", ""))
+            self.var_dpi.set(str(cfg.get("dpi", 120)))
+            self.var_adv_on.set(bool(cfg.get("adv_on", False)))
+            self.var_adv_london.set(bool(cfg.get("adv_london", True)))
+            self.var_adv_ny.set(bool(cfg.get("adv_ny", True)))
+            self.var_adv_lon_mult.set(str(cfg.get("adv_lon_mult", 1.5)))
+            self.var_adv_ny_mult.set(str(cfg.get("adv_ny_mult", 1.5)))
+            self.var_full_day.set(bool(cfg.get("full_day", False)))
 
         self._apply_styles(); self._update_all_cards()
         self.btn_upc.config(text=self.var_up_color.get()); self.btn_dwc.config(text=self.var_down_color.get()); self.btn_bg.config(text=self.var_chart_bg.get())
-        self._toggle_override(); self._toggle_custom(); self._refresh_advanced_enabled(); self._refresh_full_day_state(); self._update_eff_label()
-        self._redraw_current()
+        self._toggle_override(); self._toggle_custom(); self._refresh_advanced_enabled(); self._refresh_full_day_state(); self._schedule_eff_label()
+        self._schedule_redraw()
 
     def save_preset(self):
         name = getattr(self, "var_preset_name", tk.StringVar()).get().strip()
@@ -915,7 +1338,8 @@ class App(tk.Tk):
             messagebox.showwarning("Preset", "Enter a preset name first."); return
         path = preset_path(name); cfg = self.current_config()
         try:
-            with open(path, "w", encoding="utf-8") as f: json.dump(cfg, f, indent=2)
+            with open(path, "wb") as f: f.write(_dumps(cfg))
+            self._preset_cache = None
             self._set_status(f"Preset saved → {path}", ok=True); self._refresh_presets_list(select=name)
         except Exception as e:
             messagebox.showerror("Preset", str(e))
@@ -926,7 +1350,7 @@ class App(tk.Tk):
             messagebox.showwarning("Preset", "Choose a preset to load."); return
         path = preset_path(name)
         try:
-            with open(path, "r", encoding="utf-8") as f: cfg = json.load(f)
+            with open(path, "rb") as f: cfg = _loads(f.read())
             self.apply_config(cfg); self._set_status(f"Preset loaded: {name}", ok=True)
         except Exception as e:
             messagebox.showerror("Preset", str(e))
@@ -940,12 +1364,14 @@ class App(tk.Tk):
         if not os.path.exists(path):
             messagebox.showwarning("Preset", "Preset file not found."); return
         try:
-            os.remove(path); self._set_status(f"Preset deleted: {name}", ok=True); self._refresh_presets_list(select="")
+            os.remove(path); self._preset_cache = None
+            self._set_status(f"Preset deleted: {name}", ok=True); self._refresh_presets_list(select="")
         except Exception as e:
             messagebox.showerror("Preset", str(e))
 
     def _refresh_presets_list(self, select: str = ""):
-        items = list_presets()
+        if self._preset_cache is None: self._preset_cache = list_presets()
+        items = self._preset_cache
         if hasattr(self, "cmb_presets"):
             self.cmb_presets["values"] = items
         if select and select in items:
@@ -964,18 +1390,21 @@ class App(tk.Tk):
             else: subprocess.call(["xdg-open", path])
         except Exception: webbrowser.open(f"file://{path}")
 
-    def _save_csv(self, candles: List[Candle], path: str):
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f); w.writerow(["time(NY UTC-4)","open","high","low","close"])
-            for c in candles:
-                w.writerow([c.t.strftime("%Y-%m-%d %H:%M"),
-                            f"{c.o:.6f}", f"{c.h:.6f}", f"{c.l:.6f}", f"{c.c:.6f}"])
+    def _save_csv(self, series: Series, path: str):
+        # One record array straight from the SoA columns; savetxt formats it through a 1 MiB buffer
+        # (CRLF rows, same bytes as the old csv.writer export)
+        rows = np.rec.fromarrays([series.minute_strings, series.o, series.h, series.l, series.c])
+        with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+            np.savetxt(f, rows, fmt=["%s", "%.6f", "%.6f", "%.6f", "%.6f"], delimiter=",", newline="\r\n",
+                       header="time(NY UTC-4),open,high,low,close", comments="")
+
+    _SANITIZE_TBL = str.maketrans({ch: "_" for ch in '<>:"/\\|?*'})
 
     def _sanitize(self, name: str) -> str:
-        bad = '<>:"/\\|?*'; return "".join("_" if ch in bad else ch for ch in name)
+        return name.translate(self._SANITIZE_TBL)
 
     def _set_status(self, text: str, ok: bool):
-        pal = self.palette; self.status.configure(text=text, foreground=(pal["TXT"] if ok else "#f87171"))
+        self.status.configure(text=text, foreground=self._status_fg[ok])
 
     def _as_int(self, val: str, name: str, min_val: Optional[int]=None, max_val: Optional[int]=None) -> int:
         v = int(float(val))
@@ -995,10 +1424,25 @@ class App(tk.Tk):
         self.bind("<Control-o>", self.open_last); self.bind("<Control-O>", self.open_last)
 
     def _quit(self, *_):
-        self._persist(); self.destroy()
-
-    def _persist(self):
-        save_settings(self.current_config())
+        self._persist(sync=True)
+        self._exec.shutdown(wait=True, cancel_futures=True)  # finish a running job (it never waits on Tk); drop a queued export
+        self.destroy()
+
+    def _persist(self, sync: bool = False):
+        """Queue a settings save for the writer thread (sync=True writes now, e.g. on quit)."""
+        cfg = self.current_config()
+        try: self._save_q.get_nowait(); self._save_q.task_done()  # drop a superseded snapshot not yet written
+        except queue.Empty: pass
+        if sync:
+            self._save_q.join()  # let an in-flight background write finish first so it can't land after ours
+            save_settings(cfg); return
+        self._save_q.put_nowait(cfg)
+
+    def _settings_writer(self):
+        while True:
+            cfg = self._save_q.get()
+            try: save_settings(cfg)
+            finally: self._save_q.task_done()
 
 if __name__ == "__main__":
     app = App()
@@ -0,0 +1,88 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import coinf_gui
+from coinf_gui import App, session_mult_lut, simulate_candle, simulate_series
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+SESSIONS = [(8*60, 17*60, 1.5), (13*60+30, 20*60, 1.5)]
+
+# Files written by the original random.Random / csv.writer implementation
+BASELINES = [
+    ("baseline_legacy_seed42_tf1.csv", dict(seed=42, minutes_per_candle=1, start_time_ny=datetime(2025, 3, 7))),
+    ("baseline_legacy_seed7_tf2.999_sessions.csv",
+     dict(seed=7, minutes_per_candle=2.999, start_time_ny=datetime(2025, 3, 7, 16), session_volatility=SESSIONS)),
+]
+
+def legacy_series(**kw):
+    return simulate_series(600, 30, tick_size=0.25, start_price=10000, up_prob=0.5, rng_kind="legacy", **kw)
+
+@pytest.mark.parametrize("name, kw", BASELINES)
+def test_legacy_rng_matches_baseline(name, kw):
+    with open(os.path.join(DATA_DIR, name), encoding="utf-8") as f:
+        rows = [line.split(",") for line in f.read().splitlines()[1:]]
+    series = legacy_series(**kw)
+    assert len(series) == len(rows)
+    for candle, (t, o, h, l, c) in zip(series, rows):
+        assert candle.t.strftime("%Y-%m-%d %H:%M") == t
+        assert [f"{v:.6f}" for v in (candle.o, candle.h, candle.l, candle.c)] == [o, h, l, c]
+
+@pytest.mark.parametrize("name, kw", BASELINES)
+def test_csv_matches_baseline_bytes(name, kw, tmp_path):
+    out = tmp_path / "data.csv"
+    App._save_csv(None, legacy_series(**kw), str(out))  # _save_csv touches no widget state
+    with open(os.path.join(DATA_DIR, name), "rb") as f:
+        assert out.read_bytes() == f.read()
+
+KERNELS = [False] + ([True] if coinf_gui.HAVE_NUMBA else [])
+
+def per_candle(seed, num, ticks, tick_size, up_prob, mults):
+    """Reference: one simulate_candle() call per candle on the same PCG64 stream."""
+    rng = np.random.default_rng(seed); price = 10000.0; rows = []
+    for m in mults:
+        rows.append(simulate_candle(price, ticks, tick_size*float(m), up_prob, rng)); price = rows[-1][3]
+    return np.array(rows).T
+
+@pytest.mark.parametrize("numba", KERNELS)
+@pytest.mark.parametrize("ticks, up_prob, tick_size", [(30, 0.5, 0.25), (3000, 0.5, 0.1), (70, 0.37, 0.01), (0, 0.5, 0.25)])
+def test_block_paths_match_per_candle_bits(monkeypatch, numba, ticks, up_prob, tick_size):
+    monkeypatch.setattr(coinf_gui, "HAVE_NUMBA", numba)  # 3000 ticks spans several 1M-tick blocks
+    kw = dict(start_time_ny=datetime(2025, 3, 7), vol_lut=session_mult_lut(SESSIONS))
+    series = simulate_series(1000, ticks, 1, tick_size, 10000.0, up_prob, seed=123, **kw)
+    mults = coinf_gui.session_multipliers(series.t, kw["vol_lut"])
+    ref = per_candle(123, 1000, ticks, tick_size, up_prob, mults)
+    for got, want in zip((series.o, series.h, series.l, series.c), ref):
+        assert np.array_equal(got, want)
+
+@pytest.mark.parametrize("numba", KERNELS)
+@pytest.mark.parametrize("ticks", [0, -3])
+def test_candle_without_ticks_is_flat(monkeypatch, numba, ticks):
+    monkeypatch.setattr(coinf_gui, "HAVE_NUMBA", numba)
+    for up_prob in (0.5, 0.3):
+        assert simulate_candle(100.0, ticks, 0.5, up_prob, np.random.default_rng(1)) == (100.0,)*4
+
+@pytest.mark.skipif(not coinf_gui.HAVE_NUMBA, reason="numba not installed")
+def test_numba_core_matches_numpy_block():
+    rng = np.random.default_rng(5)
+    ups = coinf_gui.draw_ups(rng, (500, 257), 0.5); mults = rng.choice([1.0, 1.5, 2.25], 500)
+    out_nb = [np.empty(500) for _ in range(4)]; out_np = [np.empty(500) for _ in range(4)]
+    last_nb = coinf_gui._simulate_core(1234.5, 0.1, mults, ups, *out_nb)
+    last_np = coinf_gui._simulate_block_np(1234.5, 0.1, mults, ups, *out_np)
+    assert last_nb == last_np
+    for a, b in zip(out_nb, out_np):
+        assert np.array_equal(a, b)
+
+def test_batch_is_reproducible_per_seed():
+    args = (200, 40, 1, 0.25, 10000.0, 0.5)
+    a = coinf_gui.simulate_batch(3, *args, seed=9, max_workers=3, start_time_ny=datetime(2025, 3, 7))
+    b = coinf_gui.simulate_batch(3, *args, seed=9, max_workers=1, start_time_ny=datetime(2025, 3, 7))
+    for x, y in zip(a, b):
+        assert all(np.array_equal(u, v) for u, v in zip((x.t, x.o, x.h, x.l, x.c), (y.t, y.o, y.h, y.l, y.c)))
+    assert not np.array_equal(a[0].c, a[1].c)  # runs use independent child streams
+
+def test_batch_rejects_legacy_rng():
+    with pytest.raises(ValueError, match="pcg64"):
+        coinf_gui.simulate_batch(2, 10, 30, 1, 1.0, 100.0, 0.5, seed=1, rng_kind="legacy")
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from coinf_gui import (SKIP_HOUR_END_NY, SKIP_HOUR_START_NY, datetime64_minute_strings,
+                       is_in_skipped_hour_ny, ny_times_skipping_hour)
+
+def advance_ny_time_skipping_hour(t_local_ny: datetime, minutes: float) -> datetime:
+    """Reference: the original per-candle loop ny_times_skipping_hour replaced."""
+    if is_in_skipped_hour_ny(t_local_ny):
+        t_local_ny = t_local_ny.replace(hour=SKIP_HOUR_END_NY, minute=0, second=0, microsecond=0)
+    remaining = minutes
+    cur = t_local_ny
+    while remaining > 0:
+        boundary = cur.replace(hour=SKIP_HOUR_START_NY, minute=0, second=0, microsecond=0)
+        if cur >= boundary:
+            boundary = boundary + timedelta(days=1)
+        delta_to_boundary = (boundary - cur).total_seconds() / 60.0
+        if remaining < delta_to_boundary:
+            return cur + timedelta(minutes=remaining)
+        else:
+            cur = boundary.replace(hour=SKIP_HOUR_END_NY)
+            remaining -= max(0.0, delta_to_boundary)
+    return cur
+
+def reference_times(start: datetime, count: int, minutes: float) -> list:
+    out = []; cur = start
+    for _ in range(count):
+        out.append(cur); cur = advance_ny_time_skipping_hour(cur, minutes)
+    return out
+
+@pytest.mark.parametrize("minutes", [1, 5, 60, 2.999, 0.123, 0.45678, 7.3])
+@pytest.mark.parametrize("start", [datetime(2025, 3, 7), datetime(2025, 3, 7, 16, 58, 30), datetime(2025, 3, 7, 18)])
+def test_times_match_reference_loop(start, minutes):
+    ref = reference_times(start, 3000, minutes)
+    got = ny_times_skipping_hour(start, 3000, minutes)
+    assert got.dtype == np.dtype("datetime64[us]")
+    assert datetime64_minute_strings(got).tolist() == [t.strftime("%Y-%m-%d %H:%M") for t in ref]
+    assert got.astype(datetime).tolist() == ref
+
+def test_times_never_land_in_skipped_hour():
+    t = ny_times_skipping_hour(datetime(2025, 3, 7), 5000, 0.45678).astype(datetime)
+    assert not any(is_in_skipped_hour_ny(x) for x in t)